@@ -1,8 +1,139 @@
 import ast
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
+from dataclasses import dataclass
 from email.mime import base
+import functools
+import glob
+import hashlib
+import io
+import itertools
 import json
+import pickle
 import sys
 import os
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__version__ = '1.0.0'
+
+# Per-user location, so a cache directory shipped inside an analyzed
+# project is never unpickled
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'python-code-analyzer'
+)
+
+# Arguments of zero-argument functions; returning this directly skips
+# building a list and converting it (CPython's () is already a singleton)
+_EMPTY = ()
+
+# Python 3.13+ can constant-fold while parsing, leaving fewer nodes to walk
+_COMPILE_FLAGS = ast.PyCF_ONLY_AST
+if sys.version_info >= (3, 13):
+    _COMPILE_FLAGS |= ast.PyCF_OPTIMIZED_AST
+
+
+def _cache_path(code):
+    """Build the AST cache path for a piece of source code"""
+    digest = hashlib.sha256(__version__.encode() + b':' + code).hexdigest()
+    major, minor = sys.version_info[:2]
+    return os.path.join(CACHE_DIR, f"{digest}-py{major}{minor}.pkl")
+
+
+def _compile_ast(code, filename):
+    """Parse source code straight through compile()"""
+    return compile(code, filename, 'exec', flags=_COMPILE_FLAGS, dont_inherit=True)
+
+
+def _parse_source(code, filename, use_cache=True):
+    """Parse source code, reusing a pickled AST from a previous run if possible"""
+    if not use_cache:
+        return _compile_ast(code, filename)
+
+    cache_file = _cache_path(code)
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                tree = pickle.load(f)
+            if isinstance(tree, ast.AST):
+                return tree
+        except Exception:
+            pass  # Corrupt or unreadable entry, parse again below
+
+    tree = _compile_ast(code, filename)
+
+    # Write to a temp file and rename so readers never see a partial pickle
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except (OSError, RecursionError, pickle.PicklingError):
+        # Caching is best effort (very deep trees can't be pickled)
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    return tree
+
+
+def _read_source(path):
+    """Read a Python source file as raw bytes in one unbuffered read"""
+    # O_BINARY stops Windows from translating CRLF or stopping at Ctrl-Z
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            # os.read may return less than asked for, so loop until EOF;
+            # pipes and FIFOs report a size of 0, so never read less than a buffer
+            chunk = os.read(fd, max(size, io.DEFAULT_BUFFER_SIZE))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    # The parser decodes bytes itself, honouring any coding declaration
+    return b''.join(chunks)
+
+
+def _load_source(path, use_cache=True):
+    """Read and parse a file, returning (source bytes, tree)"""
+    code = _read_source(path)
+    return code, _parse_source(code, path, use_cache)
+
+
+# Small on purpose: it only needs to cover files analyzed more than once in
+# one process (e.g. comparing a file with itself), and every entry keeps a
+# whole tree alive
+@functools.lru_cache(maxsize=8)
+def _parse_cached(path, mtime_ns, size, use_cache=True):
+    """Read and parse a file once per process for a given (path, mtime, size)"""
+    return _load_source(path, use_cache)
+
+
+def _write_atomic(path, data):
+    """Write bytes to a file so it is either fully replaced or left untouched"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Per-process temp name, so concurrent runs never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 
 def validate_file(filepath):
     """Validate that file exists and is a Python file"""
@@ -17,9 +148,162 @@ def validate_file(filepath):
             return False
     
     return True
+
+
+@dataclass
+class FunctionInfo:
+    """A function or method definition"""
+    __slots__ = ('name', 'line_number', 'arguments', 'has_docstring')
+    name: str
+    line_number: int
+    arguments: tuple
+    has_docstring: bool
+
+
+@dataclass
+class ClassInfo:
+    """A class definition and the names of its methods"""
+    __slots__ = ('name', 'line_number', 'methods')
+    name: str
+    line_number: int
+    methods: list
+
+
+@dataclass
+class ImportInfo:
+    """A single imported name"""
+    __slots__ = ('module', 'alias', 'line')
+    module: str
+    alias: Optional[str]
+    line: int
+
+
+if sys.version_info >= (3, 8):
+    def _has_docstring(body):
+        """Check for a docstring without building it like ast.get_docstring does"""
+        return (bool(body) and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant)
+                and type(body[0].value.value) is str)
+else:
+    def _has_docstring(body):
+        """Check for a docstring (Python 3.7 still parses strings to ast.Str)"""
+        return (bool(body) and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Str))
+
+
+def _intern_optional(name):
+    """sys.intern that passes None through (e.g. imports without an alias)"""
+    return sys.intern(name) if name is not None else None
+
+
+# Definitions and imports are always statements, and statements only ever
+# nest inside these fields of other statements (or except/case clauses),
+# never inside expressions
+_BLOCK_FIELD_NAMES = frozenset(('body', 'orelse', 'finalbody', 'handlers', 'cases'))
+
+# Node type -> its statement-holding field names, in ast.iter_fields order
+_block_fields_cache = {}
+
+
+def _block_fields(node_type):
+    """Names of the fields of a statement node type that hold nested statements"""
+    fields = _block_fields_cache.get(node_type)
+    if fields is None:
+        fields = tuple(name for name in node_type._fields if name in _BLOCK_FIELD_NAMES)
+        _block_fields_cache[node_type] = fields
+    return fields
+
+
+class _Collector:
+    """Collect functions, classes and imports in a single pass over the tree"""
+
+    def __init__(self, results):
+        self.functions = results['functions']
+        self.classes = results['classes']
+        self.imports = results['imports']
+
+        # Dispatch on the exact node type with a single dict lookup
+        self._handlers = {
+            ast.FunctionDef: self._add_function,
+            ast.ClassDef: self._add_class,
+            ast.Import: self._add_import,
+            ast.ImportFrom: self._add_import_from,
+        }
+
+    def collect(self, tree):
+        """Visit statements breadth-first, in the same order as ast.walk
+
+        Expression subtrees can't hold definitions or imports, so they are
+        never queued.
+        """
+        todo = deque([tree])
+
+        # Bind everything the loop touches to locals, skipping repeated
+        # global and attribute lookups for every node
+        popleft = todo.popleft
+        extend = todo.extend
+        get_handler = self._handlers.get
+        get_fields = _block_fields_cache.get
+        _type = type
+        _getattr = getattr
+
+        while todo:
+            node = popleft()
+            node_type = _type(node)
+            handler = get_handler(node_type)
+            if handler is not None:
+                handler(node)
+            # Only follow the fields that can hold statements, worked out
+            # once per node type, instead of scanning every field
+            fields = get_fields(node_type)
+            if fields is None:
+                fields = _block_fields(node_type)
+            for name in fields:
+                extend(_getattr(node, name))
+
+    def _add_function(self, node):
+        # Names like 'self' repeat across a file, so the handlers intern
+        # them to share one string object per distinct name
+        args = node.args.args
+        self.functions.append(FunctionInfo(
+            sys.intern(node.name),
+            node.lineno,
+            tuple([sys.intern(arg.arg) for arg in args]) if args else _EMPTY,
+            _has_docstring(node.body)
+        ))
+
+    def _add_class(self, node):
+        # Find methods in this class
+        methods = []
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                methods.append(sys.intern(item.name))
+
+        self.classes.append(ClassInfo(sys.intern(node.name), node.lineno, methods))
+
+    def _add_import(self, node):
+        for alias in node.names:
+            self.imports.append(ImportInfo(
+                sys.intern(alias.name),
+                _intern_optional(alias.asname),
+                node.lineno
+            ))
+
+    def _add_import_from(self, node):
+        module = node.module if node.module else ''
+        for alias in node.names:
+            self.imports.append(ImportInfo(
+                sys.intern(f"{module}.{alias.name}" if module else alias.name),
+                _intern_optional(alias.asname),
+                node.lineno
+            ))
+
+
 class CodeAnalyzer:
-    def __init__(self, filepath):
+    def __init__(self, filepath, use_cache=True, memoize=True):
         self.filepath = filepath
+        self.use_cache = use_cache
+        self.memoize = memoize
         self.results = {
             'file': filepath,
             'functions': [],
@@ -29,89 +313,46 @@ class CodeAnalyzer:
         }
     
     def read_file(self):
-        """Read the Python file"""
+        """Read the Python file as bytes"""
         try:
-            with open(self.filepath, 'r') as f:
-                return f.read()
+            return _read_source(self.filepath)
         except FileNotFoundError:
             print(f"Error: File '{self.filepath}' not found")
             return None
     
     def analyze(self):
         """Main analysis function"""
-        code = self.read_file()
-        if code is None:
-            return None
-        
-        # Parse the code
+        # Parse the code (identical files are only parsed once per process,
+        # unless memoization is off)
         try:
-            tree = ast.parse(code)
+            if self.memoize:
+                st = os.stat(self.filepath)
+                code, tree = _parse_cached(os.path.abspath(self.filepath),
+                                           st.st_mtime_ns, st.st_size, self.use_cache)
+            else:
+                code, tree = _load_source(self.filepath, self.use_cache)
+        except FileNotFoundError:
+            print(f"Error: File '{self.filepath}' not found")
+            return None
         except SyntaxError as e:
             print(f"Syntax error in file: {e}")
             return None
         
         # Analyze the tree
-        self._extract_functions(tree)
-        self._extract_classes(tree)
-        self._extract_imports(tree)
+        _Collector(self.results).collect(tree)
         self._calculate_metrics(code, tree)
         
         return self.results
     
-    def _extract_functions(self, tree):
-        """Extract all function definitions"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                func_info = {
-                    'name': node.name,
-                    'line_number': node.lineno,
-                    'arguments': [arg.arg for arg in node.args.args],
-                    'has_docstring': ast.get_docstring(node) is not None
-                }
-                self.results['functions'].append(func_info)
-    
-    def _extract_classes(self, tree):
-        """Extract all class definitions"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                # Find methods in this class
-                methods = []
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        methods.append(item.name)
-                
-                class_info = {
-                    'name': node.name,
-                    'line_number': node.lineno,
-                    'methods': methods
-                }
-                self.results['classes'].append(class_info)
-    
-    def _extract_imports(self, tree):
-        """Extract all import statements"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    self.results['imports'].append({
-                        'module': alias.name,
-                        'alias': alias.asname,
-                        'line': node.lineno
-                    })
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module if node.module else ''
-                for alias in node.names:
-                    self.results['imports'].append({
-                        'module': f"{module}.{alias.name}" if module else alias.name,
-                        'alias': alias.asname,
-                        'line': node.lineno
-                    })
-    
     def _calculate_metrics(self, code, tree):
         """Calculate basic code metrics"""
-        lines = code.split('\n')
+        # Count \n, \r\n and lone \r endings alike, as text mode's universal
+        # newlines would, without decoding or splitting the source
+        line_endings = code.count(b'\n') + code.count(b'\r') - code.count(b'\r\n')
         
         self.results['metrics'] = {
-            'total_lines': len(lines),
+            # A trailing newline ends the last line rather than starting a new one
+            'total_lines': line_endings + (1 if code and not code.endswith((b'\n', b'\r')) else 0),
             'total_functions': len(self.results['functions']),
             'total_classes': len(self.results['classes']),
             'total_imports': len(self.results['imports'])
@@ -119,39 +360,47 @@ class CodeAnalyzer:
     
     def print_results(self):
         """Print results in readable format"""
-        print("\n" + "="*50)
-        print(f"Analysis Results for: {self.filepath}")
-        print("="*50 + "\n")
+        # Build the whole report first and write it in one call
+        out = []
+        out.append("\n" + "="*50)
+        out.append(f"Analysis Results for: {self.filepath}")
+        out.append("="*50 + "\n")
         
-        print("📊 METRICS:")
+        out.append("📊 METRICS:")
         for key, value in self.results['metrics'].items():
-            print(f"  {key}: {value}")
+            out.append(f"  {key}: {value}")
         
-        print("\n📦 IMPORTS:")
+        out.append("\n📦 IMPORTS:")
         for imp in self.results['imports']:
-            alias_info = f" as {imp['alias']}" if imp['alias'] else ""
-            print(f"  Line {imp['line']}: {imp['module']}{alias_info}")
+            alias_info = f" as {imp.alias}" if imp.alias else ""
+            out.append(f"  Line {imp.line}: {imp.module}{alias_info}")
         
-        print("\n🏛️ CLASSES:")
+        out.append("\n🏛️ CLASSES:")
         for cls in self.results['classes']:
-            print(f"  {cls['name']} (Line {cls['line_number']})")
-            print(f"    Methods: {', '.join(cls['methods'])}")
+            out.append(f"  {cls.name} (Line {cls.line_number})")
+            out.append(f"    Methods: {', '.join(cls.methods)}")
         
-        print("\n🔧 FUNCTIONS:")
+        out.append("\n🔧 FUNCTIONS:")
         for func in self.results['functions']:
-            args = ', '.join(func['arguments']) if func['arguments'] else 'none'
-            docstring = "✓" if func['has_docstring'] else "✗"
-            print(f"  {func['name']}({args}) - Line {func['line_number']} [Docs: {docstring}]")
+            args = ', '.join(func.arguments) if func.arguments else 'none'
+            docstring = "✓" if func.has_docstring else "✗"
+            out.append(f"  {func.name}({args}) - Line {func.line_number} [Docs: {docstring}]")
+        
+        out.append("\n" + "="*50 + "\n")
         
-        print("\n" + "="*50 + "\n")
+        sys.stdout.write('\n'.join(out) + '\n')
     
     def save_json(self):
         """Save results to JSON file (unique filename)"""
         base = os.path.splitext(os.path.basename(self.filepath))[0]
         output_file = f"output/{base}_results.json"
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            data = orjson.dumps(self.results, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(self.results, indent=2, ensure_ascii=False,
+                              default=dataclasses.asdict).encode('utf-8')
+        _write_atomic(output_file, data)
 
         print(f"✅ Results saved to: {output_file}")
 
@@ -176,23 +425,23 @@ class CodeAnalyzer:
         if self.results['functions']:
             summary.append("🔧 FUNCTION DETAILS:")
             for func in self.results['functions']:
-                summary.append(f"   • {func['name']}() at line {func['line_number']}")
-                if func['arguments']:
-                    summary.append(f"     Parameters: {', '.join(func['arguments'])}")
+                summary.append(f"   • {func.name}() at line {func.line_number}")
+                if func.arguments:
+                    summary.append(f"     Parameters: {', '.join(func.arguments)}")
             summary.append("")
         
         # Class details
         if self.results['classes']:
             summary.append("🏛️ CLASS DETAILS:")
             for cls in self.results['classes']:
-                summary.append(f"   • {cls['name']} at line {cls['line_number']}")
-                summary.append(f"     Methods: {len(cls['methods'])} - {', '.join(cls['methods'])}")
+                summary.append(f"   • {cls.name} at line {cls.line_number}")
+                summary.append(f"     Methods: {len(cls.methods)} - {', '.join(cls.methods)}")
             summary.append("")
         
         # Dependencies
         if self.results['imports']:
             summary.append("📦 DEPENDENCIES:")
-            unique_modules = set(imp['module'].split('.')[0] for imp in self.results['imports'])
+            unique_modules = set(imp.module.split('.')[0] for imp in self.results['imports'])
             for module in sorted(unique_modules):
                 summary.append(f"   • {module}")
             summary.append("")
@@ -207,19 +456,18 @@ class CodeAnalyzer:
         output_file = f"output/{base}_summary.txt"
 
         summary = self.generate_summary()
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(summary)
+        _write_atomic(output_file, summary.encode('utf-8'))
 
         print(f"✅ Summary saved to: {output_file}")
 
-def compare_files(file1, file2):
+def compare_files(file1, file2, use_cache=True):
     """Compare two Python files"""
     print("\n" + "="*50)
     print("COMPARING TWO FILES")
     print("="*50 + "\n")
     
-    analyzer1 = CodeAnalyzer(file1)
-    analyzer2 = CodeAnalyzer(file2)
+    analyzer1 = CodeAnalyzer(file1, use_cache)
+    analyzer2 = CodeAnalyzer(file2, use_cache)
     
     results1 = analyzer1.analyze()
     results2 = analyzer2.analyze()
@@ -239,31 +487,90 @@ def compare_files(file1, file2):
     print(f"  Lines: {results2['metrics']['total_lines']}")
     
     print("\n" + "="*50 + "\n")
+
+
+def _analyze_one(path, use_cache=True):
+    """Analyze a single file (module level so worker processes can pickle it)"""
+    # Each worker sees a path only once, so memoizing would just pin trees
+    try:
+        return CodeAnalyzer(path, use_cache, memoize=False).analyze()
+    except Exception as e:
+        # One bad file shouldn't abort the rest of the directory
+        print(f"❌ Error analyzing '{path}': {type(e).__name__}: {e}")
+        return None
+
+
+def analyze_directory(directory, use_cache=True):
+    """Analyze every Python file under a directory in parallel"""
+    paths = sorted(glob.glob(os.path.join(directory, '**', '*.py'), recursive=True))
+    if not paths:
+        print(f"❌ No Python files found in '{directory}'")
+        return []
+
+    print("\n" + "="*50)
+    print(f"ANALYZING DIRECTORY: {directory}")
+    print("="*50 + "\n")
+
+    with ProcessPoolExecutor() as executor:
+        all_results = list(executor.map(_analyze_one, paths, itertools.repeat(use_cache),
+                                        chunksize=8))
+
+    analyzed = [results for results in all_results if results]
+    for path, results in zip(paths, all_results):
+        if not results:
+            print(f"{path}: ❌ analysis failed")
+            continue
+        metrics = results['metrics']
+        print(f"{path}: {metrics['total_functions']} functions, "
+              f"{metrics['total_classes']} classes, {metrics['total_lines']} lines")
+
+    print(f"\nFiles analyzed: {len(analyzed)}/{len(paths)}")
+    print(f"  Functions: {sum(r['metrics']['total_functions'] for r in analyzed)}")
+    print(f"  Classes: {sum(r['metrics']['total_classes'] for r in analyzed)}")
+    print(f"  Lines: {sum(r['metrics']['total_lines'] for r in analyzed)}")
+
+    print("\n" + "="*50 + "\n")
+
+    return all_results
+
     
 def main():
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    use_cache = '--no-cache' not in args
+    args = [arg for arg in args if arg != '--no-cache']
+
+    if len(args) < 1:
         print("Usage:")
         print("  Analyze one file: python analyzer.py <path_to_python_file>")
         print("  Compare two files: python analyzer.py <file1> <file2>")
+        print("  Analyze a directory: python analyzer.py --dir <directory>")
+        print("  Skip the AST cache: add --no-cache")
         print("\nExamples:")
         print("  python analyzer.py examples/sample.py")
         print("  python analyzer.py examples/sample.py examples/complex_example.py")
+        print("  python analyzer.py --dir examples")
         sys.exit(1)
     
-    if len(sys.argv) == 3:
+    if args[0] == '--dir':
+        # Directory mode
+        if len(args) != 2 or not os.path.isdir(args[1]):
+            print("❌ Error: --dir needs an existing directory")
+            sys.exit(1)
+        analyze_directory(args[1], use_cache)
+    elif len(args) == 2:
         # Compare mode
-        if validate_file(sys.argv[1]) and validate_file(sys.argv[2]):
-            compare_files(sys.argv[1], sys.argv[2])
+        if validate_file(args[0]) and validate_file(args[1]):
+            compare_files(args[0], args[1], use_cache)
     else:
         # Single file analysis
-        filepath = sys.argv[1]
+        filepath = args[0]
         
         if not validate_file(filepath):
             sys.exit(1)
         
         print(f"\n🔍 Analyzing: {filepath}\n")
         
-        analyzer = CodeAnalyzer(filepath)
+        analyzer = CodeAnalyzer(filepath, use_cache)
         results = analyzer.analyze()
         
         if results:
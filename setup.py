@@ -0,0 +1,22 @@
+"""Optional build step that compiles analyzer.py with Cython.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+``import analyzer`` then loads the compiled extension. Without it (or
+without Cython installed) the plain Python module is used unchanged.
+"""
+from setuptools import setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize("analyzer.py", language_level=3)
+
+setup(
+    name="python-code-analyzer",
+    py_modules=["analyzer"],
+    ext_modules=ext_modules,
+)